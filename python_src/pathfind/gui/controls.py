@@ -1,5 +1,6 @@
 import pygame
 from typing import Optional, Callable
+from .fonts import get_font
 
 
 class Button:
@@ -11,6 +12,7 @@ class Button:
     self.text = text
     self.callback = callback
     self.is_pressed = False
+    self.is_hovered = False
     self.is_active = False
     
     # Colors
@@ -22,12 +24,33 @@ class Button:
     self.border_color = (100, 100, 100)
     
     # Font
-    pygame.font.init()
-    self.font = pygame.font.Font(None, font_size)
+    self.font = get_font(font_size)
+    
+    # The text and colors never change, so each visual state is rendered once
+    self._surfaces = {
+      'normal': self._render_state(self.normal_color),
+      'hover': self._render_state(self.hover_color),
+      'pressed': self._render_state(self.pressed_color),
+      'active': self._render_state(self.active_color),
+    }
+    
+  def _render_state(self, color: tuple[int, int, int]) -> pygame.Surface:
+    """Render the button background, border and label to an offscreen surface."""
+    surface = pygame.Surface(self.rect.size)
+    local_rect = surface.get_rect()
+    pygame.draw.rect(surface, color, local_rect)
+    pygame.draw.rect(surface, self.border_color, local_rect, 2)
+    
+    text_surface = self.font.render(self.text, True, self.text_color)
+    surface.blit(text_surface, text_surface.get_rect(center=local_rect.center))
+    return surface
     
   def handle_event(self, event: pygame.event.Event) -> bool:
     """Handle mouse events for the button. Returns True if button was clicked."""
-    if event.type == pygame.MOUSEBUTTONDOWN:
+    if event.type == pygame.MOUSEMOTION:
+      # Hover is tracked from motion events so draw never has to poll the mouse
+      self.is_hovered = self.rect.collidepoint(event.pos)
+    elif event.type == pygame.MOUSEBUTTONDOWN:
       if self.rect.collidepoint(event.pos):
         self.is_pressed = True
         return False
@@ -46,26 +69,15 @@ class Button:
     
   def draw(self, screen: pygame.Surface) -> None:
     """Draw the button on the screen."""
-    # Determine button color
     if self.is_active:
-      color = self.active_color
+      state = 'active'
     elif self.is_pressed:
-      color = self.pressed_color
+      state = 'pressed'
+    elif self.is_hovered:
+      state = 'hover'
     else:
-      mouse_pos = pygame.mouse.get_pos()
-      if self.rect.collidepoint(mouse_pos):
-        color = self.hover_color
-      else:
-        color = self.normal_color
-    
-    # Draw button background
-    pygame.draw.rect(screen, color, self.rect)
-    pygame.draw.rect(screen, self.border_color, self.rect, 2)
-    
-    # Draw button text
-    text_surface = self.font.render(self.text, True, self.text_color)
-    text_rect = text_surface.get_rect(center=self.rect.center)
-    screen.blit(text_surface, text_rect)
+      state = 'normal'
+    screen.blit(self._surfaces[state], self.rect)
 
 
 class ToggleButton:
@@ -78,6 +90,7 @@ class ToggleButton:
     self.text = text
     self.callback = callback
     self.is_pressed = False
+    self.is_hovered = False
     self.is_toggled = initial_state
     
     # Colors
@@ -89,12 +102,14 @@ class ToggleButton:
     self.border_color = (100, 100, 100)
     
     # Font
-    pygame.font.init()
-    self.font = pygame.font.Font(None, font_size)
+    self.font = get_font(font_size)
     
   def handle_event(self, event: pygame.event.Event) -> bool:
     """Handle mouse events for the toggle button. Returns True if state changed."""
-    if event.type == pygame.MOUSEBUTTONDOWN:
+    if event.type == pygame.MOUSEMOTION:
+      # Hover is tracked from motion events so draw never has to poll the mouse
+      self.is_hovered = self.rect.collidepoint(event.pos)
+    elif event.type == pygame.MOUSEBUTTONDOWN:
       if self.rect.collidepoint(event.pos):
         self.is_pressed = True
         return False
@@ -123,12 +138,10 @@ class ToggleButton:
       color = self.toggled_color
     elif self.is_pressed:
       color = self.pressed_color
+    elif self.is_hovered:
+      color = self.hover_color
     else:
-      mouse_pos = pygame.mouse.get_pos()
-      if self.rect.collidepoint(mouse_pos):
-        color = self.hover_color
-      else:
-        color = self.normal_color
+      color = self.normal_color
     
     # Draw toggle background
     pygame.draw.rect(screen, color, self.rect)
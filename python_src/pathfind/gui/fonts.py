@@ -0,0 +1,13 @@
+import pygame
+
+# Fonts shared by the grid view and the controls, keyed by point size
+_FONT_CACHE: dict[int, pygame.font.Font] = {}
+
+
+def get_font(size: int) -> pygame.font.Font:
+  """Return the default font at the given size, creating it on first use."""
+  font = _FONT_CACHE.get(size)
+  if font is None:
+    pygame.font.init()
+    font = _FONT_CACHE[size] = pygame.font.Font(None, size)
+  return font
\ No newline at end of file
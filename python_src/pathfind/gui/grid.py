@@ -1,140 +1,217 @@
+import functools
+import os
 import pygame
-import pygame.gfxdraw
 import numpy as np
-import math
 from typing import Optional
+from .fonts import get_font
 
+# Rendered waypoint labels, reused across frames
+_NUMBER_CACHE: dict[tuple[int, int], pygame.Surface] = {}
 
-def draw_thick_aaline(screen: pygame.Surface, color: tuple[int, int, int], 
-                     start_pos: tuple[int, int], end_pos: tuple[int, int], width: int) -> None:
-  """Draw a thick anti-aliased line by drawing multiple parallel aalines.
+
+def render_number(number: int, size: int) -> pygame.Surface:
+  """Return the white label surface for a waypoint number, rendering it on first use."""
+  key = (number, size)
+  text_surface = _NUMBER_CACHE.get(key)
+  if text_surface is None:
+    text_surface = _NUMBER_CACHE[key] = get_font(size).render(str(number), True, (255, 255, 255))
+  return text_surface
+
+
+class WaypointRenderer:
+  """Cache of pre-rendered marker sprites: a filled circle with an optional centered label."""
+  
+  def __init__(self):
+    self._sprites: dict[tuple, pygame.Surface] = {}
+    
+  def sprite(self, color: tuple[int, int, int], radius: int, 
+             label: Optional[int] = None, font_size: int = 16) -> pygame.Surface:
+    """Return the marker sprite, rendering it on first use.
+    
+    Args:
+      color: RGB fill color of the circle
+      radius: Circle radius in pixels
+      label: Number drawn in white on the circle, or None for a plain circle
+      font_size: Font size of the label
+      
+    Returns:
+      SRCALPHA surface of size (2 * radius + 1) with the circle centered on (radius, radius)
+    """
+    key = (color, radius, label, font_size)
+    surface = self._sprites.get(key)
+    if surface is None:
+      surface = pygame.Surface((2 * radius + 1, 2 * radius + 1), pygame.SRCALPHA)
+      pygame.draw.circle(surface, color, (radius, radius), radius)
+      if label is not None:
+        text_surface = render_number(label, font_size)
+        surface.blit(text_surface, text_surface.get_rect(center=(radius, radius)))
+      self._sprites[key] = surface
+    return surface
+    
+  def draw(self, screen: pygame.Surface, center: tuple[int, int], color: tuple[int, int, int], 
+           radius: int, label: Optional[int] = None, font_size: int = 16) -> None:
+    """Blit a marker sprite centered on the given pixel position."""
+    screen.blit(self.sprite(color, radius, label, font_size), (center[0] - radius, center[1] - radius))
+
+
+# Waypoint and drone markers only ever differ in position, so one shared renderer serves every frame
+MARKERS = WaypointRenderer()
+
+
+def draw_polyline(screen: pygame.Surface, color: tuple[int, int, int], 
+                  points: list[list[int]], width: int) -> None:
+  """Draw a connected anti-aliased polyline with a batched draw call per pass.
   
   Args:
     screen: Pygame surface to draw on
     color: RGB color tuple
-    start_pos: (x, y) starting position
-    end_pos: (x, y) ending position  
+    points: (x, y) pixel positions of the polyline vertices
     width: Line thickness in pixels
   """
-  if width <= 1:
-    # For thin lines, just use regular anti-aliased line
-    try:
-      pygame.gfxdraw.line(screen, start_pos[0], start_pos[1], end_pos[0], end_pos[1], color)
-    except (ValueError, OverflowError):
-      pygame.draw.line(screen, color, start_pos, end_pos, 1)
+  if len(points) < 2:
     return
-  
-  # Calculate perpendicular direction for thickness
-  dx = end_pos[0] - start_pos[0]
-  dy = end_pos[1] - start_pos[1]
-  length = math.sqrt(dx * dx + dy * dy)
-  
-  if length == 0:
-    return  # Can't draw zero-length line
-  
-  # Unit perpendicular vector
-  perp_x = -dy / length
-  perp_y = dx / length
-  
-  # Draw multiple parallel lines to create thickness
-  half_width = width / 2.0
-  for i in range(width):
-    offset = (i - half_width + 0.5)
-    
-    # Calculate offset positions
-    offset_x = int(offset * perp_x)
-    offset_y = int(offset * perp_y)
-    
-    start_offset = (start_pos[0] + offset_x, start_pos[1] + offset_y)
-    end_offset = (end_pos[0] + offset_x, end_pos[1] + offset_y)
-    
-    # Draw anti-aliased line
-    try:
-      pygame.gfxdraw.line(screen, start_offset[0], start_offset[1], 
-                         end_offset[0], end_offset[1], color)
-    except (ValueError, OverflowError):
-      # Fallback to regular line if coordinates are out of bounds
-      pygame.draw.line(screen, color, start_offset, end_offset, 1)
+  if width > 1:
+    pygame.draw.lines(screen, color, False, points, width)
+  pygame.draw.aalines(screen, color, False, points)
 
 
 def load_map(path: str) -> np.ndarray:
   """Load a map from an image file.
   
+  Decoded maps are cached by path and modification time, so loading the same
+  unchanged file again skips decoding and thresholding.
+  
   Args:
     path: Path to the image file
     
   Returns:
-    2D numpy boolean array where True indicates obstacles/walls
+    2D numpy uint8 array where 1 indicates obstacles/walls; a fresh copy the caller may edit
   """
+  return _load_map_cached(path, os.path.getmtime(path)).copy()
+
+
+@functools.lru_cache(maxsize=8)
+def _load_map_cached(path: str, mtime: float) -> np.ndarray:
+  """Decode and threshold a map image; mtime is only part of the cache key."""
   WALL_THRESH = 128
   
-  surf = pygame.image.load(path).convert()
-  arr = pygame.surfarray.pixels3d(surf)
-  gray = (0.2126 * arr[:, :, 0] + 0.7152 * arr[:, :, 1] + 0.0722 * arr[:, :, 2]).T.astype(np.uint8)
+  # array3d copies out RGB from any pixel format, so no display is needed for convert()
+  arr = pygame.surfarray.array3d(pygame.image.load(path))
+  
+  # Luma weights 0.2126, 0.7152, 0.0722 as 8-bit fixed point; they sum to 256, so
+  # white stays 255 and the uint16 accumulator can't overflow
+  gray = (arr[:, :, 0].astype(np.uint16) * 54 + arr[:, :, 1].astype(np.uint16) * 183
+          + arr[:, :, 2].astype(np.uint16) * 19) >> 8
   
   # Use a threshold to determine walls - pixels darker than WALL_THRESH become walls
-  occ = (gray < WALL_THRESH)
-  return occ.copy()
+  occ = (gray.T < WALL_THRESH).view(np.uint8)
+  
+  # Cached arrays are shared between calls, so guard against accidental edits
+  occ.flags.writeable = False
+  return occ
+
+
+def grid_pixels(occ: np.ndarray) -> np.ndarray:
+  """Convert an occupancy grid to a (W, H, 3) RGB array with one pixel per cell.
+  
+  Args:
+    occ: 2D numpy uint8 array for occupancy grid
+    
+  Returns:
+    uint8 array in surfarray (x, y) order with black walls and white free space
+  """
+  gray = np.where(occ.T, np.uint8(0), np.uint8(255))
+  return np.dstack((gray, gray, gray))
+
+
+def build_grid_surface(occ: np.ndarray, zoom: int) -> pygame.Surface:
+  """Render the whole occupancy grid to a surface in one bulk copy.
+  
+  The grid is rendered at one pixel per cell and enlarged by pygame's
+  nearest-neighbour scale, which is cheaper than repeating the array in numpy.
+  """
+  surface = pygame.surfarray.make_surface(grid_pixels(occ))
+  if zoom == 1:
+    return surface
+  H, W = occ.shape
+  return pygame.transform.scale(surface, (W * zoom, H * zoom))
+
+
+def update_grid_surface(grid_surface: pygame.Surface, occ: np.ndarray, zoom: int, 
+                        rect: tuple[int, int, int, int]) -> None:
+  """Re-render only the cells inside rect onto an existing grid surface.
+  
+  Args:
+    grid_surface: Surface previously created by build_grid_surface
+    occ: 2D numpy uint8 array for occupancy grid
+    zoom: Pixel size of each grid cell
+    rect: (y0, y1, x0, x1) cell range to refresh, end-exclusive
+  """
+  y0, y1, x0, x1 = rect
+  if y1 <= y0 or x1 <= x0:
+    return
+  grid_surface.blit(build_grid_surface(occ[y0:y1, x0:x1], zoom), (x0 * zoom, y0 * zoom))
+
+
+def draw_path_segments(surface: pygame.Surface, path: np.ndarray, zoom: int,
+                       return_start_index: int, start: int, end: int, margin: int = 0) -> None:
+  """Draw path segments start..end-1, where segment i joins path[i] and path[i + 1].
+  
+  Args:
+    surface: Pygame surface to draw on
+    path: (N, 2) array of (y, x) points for path
+    zoom: Pixel size of each grid cell
+    return_start_index: Index where return path segment begins (-1 if no return path)
+    start: First segment to draw
+    end: One past the last segment to draw
+    margin: Pixel offset of the grid on the surface
+  """
+  end = min(end, len(path) - 1)
+  if end <= start:
+    return
+    
+  main_path_color = (50, 150, 255)  # blue for main path
+  return_path_color = (255, 150, 50)  # orange for return path
+  line_width = max(1, zoom // 3)
+  
+  # Segments starting at or after return_start_index belong to the return path
+  split = end if return_start_index < 0 else min(max(return_start_index, start), end)
+  # Pixel centers of all cells at once; columns are swapped from (y, x) to (x, y)
+  points = (path[start:end + 1, ::-1] * zoom + (margin + zoom // 2)).tolist()
+  draw_polyline(surface, main_path_color, points[:split - start + 1], line_width)
+  draw_polyline(surface, return_path_color, points[split - start:], line_width)
 
 
 def draw_grid(screen: pygame.Surface,
               occ: np.ndarray, waypoints: list[tuple[int, int]], 
-              path: Optional[list[tuple[int, int]]], 
+              path_surface: Optional[pygame.Surface], 
               drone: Optional[tuple[float, float]] = None,
-              zoom: int = 4, 
-              return_start_index: int = -1, margin: int = 20,
-              path_draw_index: int = -1) -> None:
+              zoom: int = 4, margin: int = 20,
+              grid_surface: Optional[pygame.Surface] = None) -> None:
   """Draw the grid, path, and markers on the screen.
   
   Args:
     screen: Pygame surface to draw on
-    occ: 2D numpy boolean array for occupancy grid
+    occ: 2D numpy uint8 array for occupancy grid
     waypoints: List of (y, x) waypoints to visit in order
-    path: List of (y, x) tuples for path, or None
+    path_surface: Grid-sized overlay with the path drawn by draw_path_segments, or None
     drone: (y, x) tuple for current drone position during animation, or None
     zoom: Pixel size of each grid cell
-    return_start_index: Index where return path segment begins (-1 if no return path)
     margin: Pixel margin from window edges
-    path_draw_index: How much of the path to draw (for animation), -1 means draw all
+    grid_surface: Prerendered grid from build_grid_surface, rebuilt from occ if None
   """
-  H, W = occ.shape
-  
   # Draw grid cells
-  for y in range(H):
-    for x in range(W):
-      color_value = 0 if occ[y, x] else 255  # black for walls, white for free space
-      cell_color = (color_value, color_value, color_value)
-      cell_rect = (margin + x * zoom, margin + y * zoom, zoom, zoom)
-      pygame.draw.rect(screen, cell_color, cell_rect)
+  if grid_surface is None:
+    grid_surface = build_grid_surface(occ, zoom)
+  screen.blit(grid_surface, (margin, margin))
       
   # Draw path with different colors for main path and return path
-  if path and len(path) > 1:
-    main_path_color = (50, 150, 255)  # blue for main path
-    return_path_color = (255, 150, 50)  # orange for return path
-    line_width = max(1, zoom // 3)
-    
-    # Determine how much of the path to draw
-    draw_up_to = len(path) - 1 if path_draw_index == -1 else min(path_draw_index, len(path) - 1)
-    
-    for i in range(draw_up_to):
-      if i + 1 < len(path):  # Make sure we have a next point
-        (y0, x0), (y1, x1) = path[i], path[i + 1]
-        start_pos = (margin + x0 * zoom + zoom // 2, margin + y0 * zoom + zoom // 2)
-        end_pos = (margin + x1 * zoom + zoom // 2, margin + y1 * zoom + zoom // 2)
-        
-        # Choose color based on whether this segment is part of the return path
-        if return_start_index >= 0 and i >= return_start_index:
-          path_color = return_path_color
-        else:
-          path_color = main_path_color
-        
-        # Draw anti-aliased lines for smoother appearance
-        draw_thick_aaline(screen, path_color, start_pos, end_pos, line_width)
+  if path_surface is not None:
+    screen.blit(path_surface, (margin, margin))
         
   # Draw waypoints with numbers
   if waypoints:
-    pygame.font.init()
-    font = pygame.font.Font(None, max(16, zoom * 3))
+    font_size = max(16, zoom * 3)
     
     for i, waypoint in enumerate(waypoints):
       y, x = waypoint
@@ -149,18 +226,28 @@ def draw_grid(screen: pygame.Surface,
       else:
         color = (50, 150, 255)  # Blue for intermediate waypoints
       
-      # Draw circle
-      pygame.draw.circle(screen, color, center_pos, radius)
-      
-      # Draw number on the waypoint
-      number_text = str(i + 1)
-      text_surface = font.render(number_text, True, (255, 255, 255))  # White text
-      text_rect = text_surface.get_rect(center=center_pos)
-      screen.blit(text_surface, text_rect)
+      # Draw circle with its number in white
+      MARKERS.draw(screen, center_pos, color, radius, i + 1, font_size)
       
   # Draw animated drone (orange circle)
   if drone: 
-    drone_color = (255, 180, 0)
-    drone_pos = (margin + int(drone[1] * zoom + zoom // 2), margin + int(drone[0] * zoom + zoom // 2))
-    drone_radius = zoom * 2
-    pygame.draw.circle(screen, drone_color, drone_pos, drone_radius)
\ No newline at end of file
+    draw_drone(screen, drone, zoom, margin)
+
+
+def draw_drone(screen: pygame.Surface, drone: tuple[float, float], zoom: int = 4, margin: int = 20) -> pygame.Rect:
+  """Draw the drone marker and return the screen area it covers.
+  
+  Args:
+    screen: Pygame surface to draw on
+    drone: (y, x) drone position in grid cells
+    zoom: Pixel size of each grid cell
+    margin: Pixel margin from window edges
+    
+  Returns:
+    Rect of the pixels touched, for erasing or partial display updates
+  """
+  drone_color = (255, 180, 0)
+  drone_pos = (margin + int(drone[1] * zoom + zoom // 2), margin + int(drone[0] * zoom + zoom // 2))
+  drone_radius = zoom * 2
+  MARKERS.draw(screen, drone_pos, drone_color, drone_radius)
+  return pygame.Rect(drone_pos[0] - drone_radius, drone_pos[1] - drone_radius, 2 * drone_radius + 1, 2 * drone_radius + 1)
\ No newline at end of file
@@ -3,7 +3,10 @@
 #   - python main.py room.png   # load image as map
 #   - python main.py            # blank canvas, draw walls manually
 
+import math
 import sys
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Optional
 from dataclasses import dataclass
 import pygame
@@ -11,9 +14,11 @@ import numpy as np
 
 from .pathfinding.astar import astar
 from .pathfinding.tsp import find_optimal_path_through_waypoints
-from .gui.grid import load_map, draw_grid
+from .gui.grid import load_map, draw_grid, draw_drone, draw_path_segments, build_grid_surface, update_grid_surface
+from .gui.fonts import get_font
 from .gui.controls import Button, ToggleButton
-from .utils.grid_utils import inflate, shortcut, resample
+from .utils.grid_utils import inflate, inflate_region, shortcut, resample, union_rect
+from .utils._jit import HAVE_NUMBA, stroke
 
 ZOOM = 3
 DRONE_RADIUS_PIX = 3
@@ -26,6 +31,13 @@ MARGIN = 20
 DRAW_SIZE = 280  # canvas size (HxW) if no image
 DRAW_RADIUS = 3  # brush size
 
+# Path planning runs off the main thread so the render loop keeps its frame rate
+PLANNER = ThreadPoolExecutor(max_workers=1)
+
+# Recent plan results keyed by plan_key, least recently used first
+PLAN_CACHE_SIZE = 16
+PLAN_CACHE: OrderedDict[tuple, Optional[tuple[np.ndarray, int]]] = OrderedDict()
+
 
 def create_default_map() -> np.ndarray:
   """Create a default map with a vertical wall and door in the middle."""
@@ -33,15 +45,15 @@ def create_default_map() -> np.ndarray:
   map_width = int(DRAW_SIZE * 0.8)
   map_height = int(DRAW_SIZE * 0.8)
   
-  # Create empty map (False = free space, True = wall)
-  occ = np.zeros((map_height, map_width), dtype=bool)
+  # Create empty map (0 = free space, 1 = wall)
+  occ = np.zeros((map_height, map_width), dtype=np.uint8)
   
   # Add rectangular border (walls around the edges)
   border_thickness = 10
-  occ[:border_thickness, :] = True  # top border
-  occ[-border_thickness:, :] = True  # bottom border
-  occ[:, :border_thickness] = True  # left border
-  occ[:, -border_thickness:] = True  # right border
+  occ[:border_thickness, :] = 1  # top border
+  occ[-border_thickness:, :] = 1  # bottom border
+  occ[:, :border_thickness] = 1  # left border
+  occ[:, -border_thickness:] = 1  # right border
   
   # Add vertical wall in the middle
   middle_x = map_width // 2
@@ -50,7 +62,7 @@ def create_default_map() -> np.ndarray:
   wall_end_x = wall_start_x + wall_thickness
   
   # Create the wall from top to bottom
-  occ[border_thickness:-border_thickness, wall_start_x:wall_end_x] = True
+  occ[border_thickness:-border_thickness, wall_start_x:wall_end_x] = 1
   
   # Create door in the middle of the wall
   door_height = max(6, map_height // 8)  # door is 1/8 of map height, minimum 6 pixels
@@ -58,7 +70,7 @@ def create_default_map() -> np.ndarray:
   door_end_y = door_start_y + door_height
   
   # Cut out the door (make it free space)
-  occ[door_start_y:door_end_y, wall_start_x:wall_end_x] = False
+  occ[door_start_y:door_end_y, wall_start_x:wall_end_x] = 0
   
   return occ
 
@@ -67,13 +79,20 @@ def create_default_map() -> np.ndarray:
 class GameState:
   """Game state container with all necessary game variables."""
   waypoints: list[tuple[int, int]] = None  # List of waypoints to visit
-  path: Optional[list[tuple[int, int]]] = None
+  path: Optional[np.ndarray] = None  # (N, 2) int32 array of (y, x) points
   return_start_index: int = -1  # Index where return path segment begins
-  anim: Optional[list[tuple[float, float]]] = None
+  anim: Optional[np.ndarray] = None  # (M, 2) evenly spaced (y, x) points for the drone
   ai: int = 0
   animating: bool = False
   path_draw_index: int = 0  # How much of the path to draw (for step-by-step animation)
   path_animating: bool = False  # Whether we're animating the path drawing
+  path_surface: Optional[pygame.Surface] = None  # Path drawn so far, as a grid-sized overlay
+  path_future: Optional[Future] = None  # Pending background plan, if any
+  path_future_key: Optional[tuple] = None  # plan_key the pending plan was submitted with
+  map_version: int = 0  # Bumped on every map edit, so cached plans for older maps never match
+  dirty: bool = True  # Whether the scene must be redrawn this frame
+  scene: Optional[pygame.Surface] = None  # Last rendered frame without the drone
+  drone_rect: Optional[pygame.Rect] = None  # Screen area the drone was last drawn over
   optimize_order: bool = True  # Whether to optimize waypoint order using TSP
   radius: float = DRONE_RADIUS_PIX
   extra: float = DRONE_SAFETY_BUFFER
@@ -84,6 +103,9 @@ class GameState:
   right_mouse_down: bool = False
   running: bool = True
   prev_mouse_pos: Optional[tuple[int, int]] = None
+  grid_surface: Optional[pygame.Surface] = None  # Prerendered base_occ, rebuilt lazily
+  grid_dirty: Optional[tuple[int, int, int, int]] = None  # (y0, y1, x0, x1) cells edited since last render
+  inflate_dirty: Optional[tuple[int, int, int, int]] = None  # cells edited since occ was last re-inflated
   
   def __post_init__(self):
     if self.waypoints is None:
@@ -143,7 +165,7 @@ def initialize_game() -> tuple[pygame.Surface, pygame.time.Clock, GameState, int
       plan_path(game_state)
   
   def replay_animation():
-    if game_state.path:
+    if game_state.path is not None:
       start_path_animation(game_state)
   
   def toggle_optimize_order(state: bool):
@@ -172,13 +194,31 @@ def initialize_game() -> tuple[pygame.Surface, pygame.time.Clock, GameState, int
   return screen, clock, game_state, H, W, buttons, optimize_toggle
 
 
+def brush_rect(y: int, x: int, H: int, W: int) -> tuple[int, int, int, int]:
+  """Return the (y0, y1, x0, x1) cell range covered by the brush at (y, x)."""
+  return (max(0, y - DRAW_RADIUS), min(H, y + DRAW_RADIUS + 1),
+          max(0, x - DRAW_RADIUS), min(W, x + DRAW_RADIUS + 1))
+
+
+def mark_map_dirty(game_state: GameState, rect: tuple[int, int, int, int]) -> None:
+  """Record that the cells in rect of base_occ were edited."""
+  game_state.map_version += 1
+  game_state.grid_dirty = union_rect(game_state.grid_dirty, rect)
+  game_state.inflate_dirty = union_rect(game_state.inflate_dirty, rect)
+
+
+def flush_inflation(game_state: GameState) -> None:
+  """Re-inflate the part of occ affected by edits since the last flush."""
+  if game_state.inflate_dirty is not None:
+    inflate_region(game_state.base_occ, game_state.occ, game_state.inflate_dirty, 
+                   game_state.radius, game_state.extra)
+    game_state.inflate_dirty = None
+
+
 def draw_at_position(base_occ: np.ndarray, y: int, x: int, H: int, W: int, is_drawing: bool) -> None:
   """Draw or erase at the given position with brush radius."""
-  for dy in range(-DRAW_RADIUS, DRAW_RADIUS + 1):
-    for dx in range(-DRAW_RADIUS, DRAW_RADIUS + 1):
-      ny, nx = y + dy, x + dx
-      if 0 <= ny < H and 0 <= nx < W:
-        base_occ[ny, nx] = is_drawing
+  y0, y1, x0, x1 = brush_rect(y, x, H, W)
+  base_occ[y0:y1, x0:x1] = is_drawing
 
 
 def draw_line_between_positions(base_occ: np.ndarray, start: tuple[int, int], end: tuple[int, int], 
@@ -187,6 +227,10 @@ def draw_line_between_positions(base_occ: np.ndarray, start: tuple[int, int], en
   y0, x0 = start
   y1, x1 = end
   
+  if HAVE_NUMBA:
+    stroke(base_occ, y0, x0, y1, x1, DRAW_RADIUS, np.uint8(is_drawing))
+    return
+  
   # Bresenham's line algorithm
   dx = abs(x1 - x0)
   dy = abs(y1 - y0)
@@ -210,6 +254,20 @@ def draw_line_between_positions(base_occ: np.ndarray, start: tuple[int, int], en
       y += sy
 
 
+def clear_path(game_state: GameState) -> None:
+  """Drop the planned path and stop any running animation."""
+  if game_state.path_future is not None:
+    game_state.path_future.cancel()  # A plan already running is simply ignored when it finishes
+    game_state.path_future = None
+  game_state.path = None
+  game_state.path_surface = None
+  game_state.anim = None
+  game_state.ai = 0
+  game_state.animating = False
+  game_state.path_draw_index = 0
+  game_state.path_animating = False
+
+
 def handle_mouse_button_down(event: pygame.event.Event, game_state: GameState, H: int, W: int) -> None:
   """Handle mouse button down events."""
   y = (event.pos[1] - MARGIN) // ZOOM
@@ -229,7 +287,9 @@ def handle_mouse_button_down(event: pygame.event.Event, game_state: GameState, H
       game_state.prev_mouse_pos = (y, x)
       draw_at_position(game_state.base_occ, y, x, H, W, False)
     
-    game_state.occ = inflate(game_state.base_occ, game_state.radius, game_state.extra)
+    if event.button in (1, 3):  # middle click and the wheel leave the map alone
+      mark_map_dirty(game_state, brush_rect(y, x, H, W))
+      flush_inflation(game_state)
 
   elif game_state.mode == "erase":
     # In erase mode, left click acts as erase for convenience
@@ -243,33 +303,28 @@ def handle_mouse_button_down(event: pygame.event.Event, game_state: GameState, H
       game_state.prev_mouse_pos = (y, x)
       draw_at_position(game_state.base_occ, y, x, H, W, False)
     
-    game_state.occ = inflate(game_state.base_occ, game_state.radius, game_state.extra)
+    if event.button in (1, 3):  # middle click and the wheel leave the map alone
+      mark_map_dirty(game_state, brush_rect(y, x, H, W))
+      flush_inflation(game_state)
     
   elif game_state.mode == "set_points":
     if event.button == 1:  # left click to add waypoint
+      flush_inflation(game_state)
       if not game_state.occ[y, x]:  # only set on free spaces
         game_state.waypoints.append((y, x))
         # Clear existing path when adding new waypoints
-        game_state.path = None
-        game_state.anim = None
-        game_state.ai = 0
-        game_state.animating = False
-        game_state.path_draw_index = 0
-        game_state.path_animating = False
+        clear_path(game_state)
     elif event.button == 3:  # right click to remove last waypoint
       if game_state.waypoints:
         game_state.waypoints.pop()
         # Clear existing path when removing waypoints
-        game_state.path = None
-        game_state.anim = None
-        game_state.ai = 0
-        game_state.animating = False
-        game_state.path_draw_index = 0
-        game_state.path_animating = False
+        clear_path(game_state)
 
 
 def handle_mouse_button_up(event: pygame.event.Event, game_state: GameState) -> None:
   """Handle mouse button up events."""
+  # Drag strokes only mark cells dirty; inflate them once the stroke ends
+  flush_inflation(game_state)
   if event.button == 1:
     game_state.left_mouse_down = False
     game_state.prev_mouse_pos = None
@@ -293,12 +348,15 @@ def handle_mouse_motion(event: pygame.event.Event, game_state: GameState, H: int
     
     # Draw line from previous position to current position for smooth lines
     if game_state.prev_mouse_pos is not None:
+      py, px = game_state.prev_mouse_pos
+      mark_map_dirty(game_state, union_rect(brush_rect(py, px, H, W), brush_rect(y, x, H, W)))
       if game_state.left_mouse_down:  # draw wall while dragging
         draw_line_between_positions(game_state.base_occ, game_state.prev_mouse_pos, (y, x), H, W, True)
       elif game_state.right_mouse_down:  # erase while dragging
         draw_line_between_positions(game_state.base_occ, game_state.prev_mouse_pos, (y, x), H, W, False)
     else:
       # Fallback for first point
+      mark_map_dirty(game_state, brush_rect(y, x, H, W))
       if game_state.left_mouse_down:
         draw_at_position(game_state.base_occ, y, x, H, W, True)
       elif game_state.right_mouse_down:
@@ -306,46 +364,88 @@ def handle_mouse_motion(event: pygame.event.Event, game_state: GameState, H: int
     
     # Update previous position for next motion event
     game_state.prev_mouse_pos = (y, x)
-    game_state.occ = inflate(game_state.base_occ, game_state.radius, game_state.extra)
 
 
 def save_map(game_state: GameState, W: int, H: int) -> None:
   """Save the current map to a PNG file."""
-  arr = np.zeros((W, H, 3), dtype=np.uint8)
-  arr[:, :, 0] = arr[:, :, 1] = arr[:, :, 2] = 255
-  ys, xs = np.where(game_state.base_occ)
-  for yy, xx in zip(ys, xs):
-    arr[xx, yy] = [0, 0, 0]
-  pygame.image.save(pygame.surfarray.make_surface(arr.swapaxes(0, 1)), "map.png")
+  pygame.image.save(build_grid_surface(game_state.base_occ, 1), "map.png")
   print("Saved map.png")
 
 
 def start_path_animation(game_state: GameState) -> None:
   """Start the path drawing animation."""
-  if game_state.path:
+  if game_state.path is not None:
     game_state.path_draw_index = 0
+    game_state.path_surface.fill((0, 0, 0, 0))
     game_state.path_animating = True
     game_state.animating = False  # Stop drone animation during path drawing
 
 
 def plan_path(game_state: GameState) -> None:
-  """Plan a path through all waypoints using TSP optimization."""
+  """Start planning a path through all waypoints using TSP optimization.
+  
+  The search runs on the PLANNER thread; poll_path_future applies the result.
+  """
   if len(game_state.waypoints) < 2:
     return  # Need at least 2 waypoints
+  
+  flush_inflation(game_state)
+  
+  # Re-planning an unchanged map with the same waypoints and settings reuses the last result
+  key = plan_key(game_state)
+  if key in PLAN_CACHE:
+    PLAN_CACHE.move_to_end(key)
+    # A plan still running for other settings must not replace this result when it finishes
+    if game_state.path_future is not None:
+      game_state.path_future.cancel()
+      game_state.path_future = None
+    apply_path_result(game_state, PLAN_CACHE[key])
+    return
     
   print(f"Planning path for {len(game_state.waypoints)} waypoints")
   for i, wp in enumerate(game_state.waypoints):
     print(f"Waypoint {i}: {wp}")
     
-  # Find path through all waypoints using the toggle setting
-  path_result = find_optimal_path_through_waypoints(
-    game_state.occ,
-    game_state.waypoints,
+  # Find path through all waypoints using the toggle setting; the planner gets
+  # its own copies so edits made while it runs can't change its inputs
+  game_state.path_future = PLANNER.submit(
+    find_optimal_path_through_waypoints,
+    game_state.occ.copy(),
+    list(game_state.waypoints),
     ALLOW_DIAGONALS,
     optimize_order=game_state.optimize_order,
     include_return=True
   )
-  
+  game_state.path_future_key = key
+
+
+def plan_key(game_state: GameState) -> tuple:
+  """Return the PLAN_CACHE key for planning the current map and waypoints."""
+  return (game_state.map_version, tuple(game_state.waypoints), game_state.optimize_order, ALLOW_DIAGONALS)
+
+
+def cache_plan(key: tuple, path_result: Optional[tuple[np.ndarray, int]]) -> None:
+  """Store a plan result, evicting the least recently used one when full."""
+  PLAN_CACHE[key] = path_result
+  PLAN_CACHE.move_to_end(key)
+  if len(PLAN_CACHE) > PLAN_CACHE_SIZE:
+    PLAN_CACHE.popitem(last=False)
+
+
+def poll_path_future(game_state: GameState) -> None:
+  """Apply the result of the background plan once it has finished."""
+  future = game_state.path_future
+  if future is None or not future.done():
+    return
+  game_state.path_future = None
+  game_state.dirty = True
+  path_result = future.result()
+  cache_plan(game_state.path_future_key, path_result)
+  apply_path_result(game_state, path_result)
+
+
+def apply_path_result(game_state: GameState, path_result: Optional[tuple[np.ndarray, int]]) -> None:
+  """Store a planned path on the game state and start animating it."""
   print(f"Path found: {path_result is not None}")
   if path_result:
     path, return_start_index = path_result
@@ -359,8 +459,10 @@ def plan_path(game_state: GameState) -> None:
     path = None
     return_start_index = -1
   
-  if path:
+  if path is not None:
+    H, W = game_state.base_occ.shape
     game_state.path = path
+    game_state.path_surface = pygame.Surface((W * ZOOM, H * ZOOM), pygame.SRCALPHA)
     game_state.return_start_index = return_start_index
     game_state.anim = resample(path, 0.6)
     game_state.ai = 0
@@ -379,17 +481,22 @@ def handle_keyboard(event: pygame.event.Event, game_state: GameState, W: int, H:
   elif game_state.mode == "find_path":
     if event.key == pygame.K_SPACE:
       plan_path(game_state)
-    elif event.key == pygame.K_a and game_state.path:
+    elif event.key == pygame.K_a and game_state.path is not None:
       game_state.animating = True
       game_state.ai = 0
 
 
 def update_path_animation(game_state: GameState) -> None:
   """Update the path drawing animation."""
-  if game_state.path_animating and game_state.path:
+  if game_state.path_animating and game_state.path is not None:
     # Draw path step by step, advancing by 3-5 points per frame for smooth animation
     if game_state.path_draw_index < len(game_state.path):
-      game_state.path_draw_index = min(game_state.path_draw_index + 3, len(game_state.path))
+      drawn = game_state.path_draw_index
+      game_state.path_draw_index = min(drawn + 3, len(game_state.path))
+      # Only the newly revealed segments are drawn onto the cached overlay
+      draw_path_segments(game_state.path_surface, game_state.path, ZOOM, game_state.return_start_index,
+                         drawn, game_state.path_draw_index)
+      game_state.dirty = True
     else:
       # Path drawing complete, start drone animation
       game_state.path_animating = False
@@ -399,38 +506,104 @@ def update_path_animation(game_state: GameState) -> None:
 
 def update_animation(game_state: GameState) -> Optional[tuple[float, float]]:
   """Update the animation state and return current drone position."""
-  if not (game_state.animating and game_state.anim):
+  if not game_state.animating or game_state.anim is None or len(game_state.anim) == 0:
     return None
     
   if game_state.ai < len(game_state.anim) - 1:
     y0, x0 = game_state.anim[game_state.ai]
     y1, x1 = game_state.anim[min(game_state.ai + 1, len(game_state.anim) - 1)]
-    v = np.array([y1 - y0, x1 - x0])
-    L = np.linalg.norm(v)
+    dy, dx = y1 - y0, x1 - x0
+    L = math.hypot(dy, dx)
     
     if L < 1e-6:
       game_state.ai += 1
       return (y1, x1)
     else:
-      step = ANIM_SPEED / max(1e-6, L)
+      step = ANIM_SPEED / L
       if step >= 1:
         game_state.ai += 1
         return (y1, x1)
       else:
-        return (y0 + v[0] * step, x0 + v[1] * step)
+        return (y0 + dy * step, x0 + dx * step)
   else:
     game_state.animating = False
-    return game_state.anim[-1]
+    return tuple(game_state.anim[-1])
+
+
+def refresh_grid_surface(game_state: GameState) -> None:
+  """Bring the cached grid surface in line with base_occ, re-rendering only edited cells."""
+  if game_state.grid_surface is None:
+    game_state.grid_surface = build_grid_surface(game_state.base_occ, ZOOM).convert()
+  elif game_state.grid_dirty is not None:
+    update_grid_surface(game_state.grid_surface, game_state.base_occ, ZOOM, game_state.grid_dirty)
+  game_state.grid_dirty = None
 
 
 def update_button_states(buttons: list[Button], game_state: GameState) -> None:
   """Update button active states based on current mode."""
   mode_to_button = {"draw": 0, "erase": 1, "set_points": 2, "find_path": 3}
   for i, button in enumerate(buttons):
-    if i == 4:  # Replay button (last index) is not a persistent mode
-      button.set_active(False)  # Replay button is never "active" as a mode
-    else:
-      button.set_active(i == mode_to_button.get(game_state.mode, 0))
+    # Replay button (last index) is not a persistent mode, so it is never "active"
+    active = i != 4 and i == mode_to_button.get(game_state.mode, 0)
+    if button.is_active != active:
+      button.set_active(active)
+      game_state.dirty = True
+
+
+def render(screen: pygame.Surface, game_state: GameState, buttons: list[Button], 
+           optimize_toggle: ToggleButton) -> None:
+  """Draw the whole frame, except the drone, to the cached scene surface."""
+  if game_state.scene is None:
+    game_state.scene = pygame.Surface(screen.get_size()).convert()
+  scene = game_state.scene
+  scene.fill((255, 255, 255))
+  
+  # Draw the grid (use base_occ for display to show original wall thickness)
+  refresh_grid_surface(game_state)
+  draw_grid(scene, game_state.base_occ, game_state.waypoints, 
+            game_state.path_surface, None, ZOOM, MARGIN, game_state.grid_surface)
+  
+  # Let the user know a plan is still being computed
+  if game_state.path_future is not None:
+    planning_text = get_font(24).render("Planning...", True, (220, 40, 40))
+    scene.blit(planning_text, (MARGIN + 8, MARGIN + 8))
+  
+  # Draw buttons
+  for button in buttons:
+    button.draw(scene)
+  
+  # Draw toggle
+  optimize_toggle.draw(scene)
+
+
+def present(screen: pygame.Surface, game_state: GameState, drone: Optional[tuple[float, float]], 
+            full: bool) -> None:
+  """Show the scene with the drone on top.
+  
+  Args:
+    screen: Display surface
+    game_state: Holds the rendered scene and the previous drone area
+    drone: (y, x) drone position, or None if there is no drone to draw
+    full: Whether the scene changed, needing a full flip; otherwise only the
+          drone's old and new areas are restored and pushed to the display
+  """
+  dirty_rects = []
+  if full:
+    screen.blit(game_state.scene, (0, 0))
+  elif game_state.drone_rect is not None:
+    # Erase the drone by restoring the scene underneath it
+    screen.blit(game_state.scene, game_state.drone_rect, game_state.drone_rect)
+    dirty_rects.append(game_state.drone_rect)
+  
+  game_state.drone_rect = None
+  if drone is not None:
+    game_state.drone_rect = draw_drone(screen, drone, ZOOM, MARGIN)
+    dirty_rects.append(game_state.drone_rect)
+  
+  if full:
+    pygame.display.flip()
+  elif dirty_rects:
+    pygame.display.update(dirty_rects)
 
 
 def main() -> None:
@@ -440,6 +613,8 @@ def main() -> None:
   while game_state.running:
     # Handle events
     for event in pygame.event.get():
+      # Any input can change what is drawn, including button hover highlights
+      game_state.dirty = True
       if event.type == pygame.QUIT:
         game_state.running = False
       else:
@@ -465,6 +640,9 @@ def main() -> None:
           elif event.type == pygame.KEYDOWN:
             handle_keyboard(event, game_state, W, H)
     
+    # Pick up a finished background plan
+    poll_path_future(game_state)
+    
     # Update button states
     update_button_states(buttons, game_state)
     
@@ -474,23 +652,17 @@ def main() -> None:
     # Update drone animation
     drone = update_animation(game_state)
     
-    # Render
-    screen.fill((255, 255, 255))
-    
-    # Draw the grid (use base_occ for display to show original wall thickness)
-    draw_grid(screen, game_state.base_occ, game_state.waypoints, 
-              game_state.path, drone, ZOOM, game_state.return_start_index, MARGIN, game_state.path_draw_index)
-    
-    # Draw buttons
-    for button in buttons:
-      button.draw(screen)
-    
-    # Draw toggle
-    optimize_toggle.draw(screen)
-    
-    pygame.display.flip()
+    # Re-render the scene only when something changed; a moving drone alone just
+    # repaints its old and new areas. The clock still caps the polling rate
+    if game_state.dirty:
+      render(screen, game_state, buttons, optimize_toggle)
+      present(screen, game_state, drone, full=True)
+      game_state.dirty = False
+    elif drone is not None or game_state.drone_rect is not None:
+      present(screen, game_state, drone, full=False)
     clock.tick(80)
   
+  PLANNER.shutdown(wait=False, cancel_futures=True)
   pygame.quit()
 
 
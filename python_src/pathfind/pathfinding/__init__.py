@@ -0,0 +1,7 @@
+from ..utils._jit import HAVE_NUMBA
+
+if HAVE_NUMBA:
+  # The explicit signature compiles the kernel and the njit helpers it calls when
+  # the module loads (or reads them back from the on-disk cache), so importing it
+  # here keeps the JIT cost out of the first real plan
+  from . import _astar_numba  # noqa: F401
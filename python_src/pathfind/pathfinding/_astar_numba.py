@@ -0,0 +1,135 @@
+import math
+import numpy as np
+from ..utils._jit import njit
+
+# Neighbor offsets: the first 4 are straight moves, the last 4 diagonal
+DY = np.array([1, -1, 0, 0, 1, 1, -1, -1], dtype=np.int64)
+DX = np.array([0, 0, 1, -1, 1, -1, 1, -1], dtype=np.int64)
+COST = np.array([1.0, 1.0, 1.0, 1.0, math.sqrt(2), math.sqrt(2), math.sqrt(2), math.sqrt(2)], dtype=np.float64)
+
+
+@njit(cache=True)
+def _heap_push(heap_f: np.ndarray, heap_i: np.ndarray, size: int, f: float, idx: int) -> int:
+  """Push (f, idx) onto the binary min-heap and return the new size."""
+  pos = size
+  while pos > 0:
+    up = (pos - 1) >> 1
+    if heap_f[up] <= f:
+      break
+    heap_f[pos] = heap_f[up]
+    heap_i[pos] = heap_i[up]
+    pos = up
+  heap_f[pos] = f
+  heap_i[pos] = idx
+  return size + 1
+
+
+@njit(cache=True)
+def _heap_pop(heap_f: np.ndarray, heap_i: np.ndarray, size: int) -> int:
+  """Remove the smallest entry from the heap and return its node index."""
+  top = heap_i[0]
+  size -= 1
+  f = heap_f[size]
+  idx = heap_i[size]
+  pos = 0
+  while True:
+    child = 2 * pos + 1
+    if child >= size:
+      break
+    if child + 1 < size and heap_f[child + 1] < heap_f[child]:
+      child += 1
+    if f <= heap_f[child]:
+      break
+    heap_f[pos] = heap_f[child]
+    heap_i[pos] = heap_i[child]
+    pos = child
+  heap_f[pos] = f
+  heap_i[pos] = idx
+  return top
+
+
+@njit('int32[:, :](uint8[:, :], int64, int64, int64, int64, boolean)', cache=True, nogil=True)
+def astar_nb(occ_u8: np.ndarray, sy: int, sx: int, gy: int, gx: int, diag: bool) -> np.ndarray:
+  """A* over a 2D occupancy grid, compiled eagerly for its one signature.
+
+  Args:
+    occ_u8: 2D uint8 occupancy grid, nonzero for obstacles
+    sy, sx: Start cell
+    gy, gx: Goal cell
+    diag: Whether diagonal moves are allowed
+
+  Returns:
+    (N, 2) int32 array of (y, x) rows from start to goal, with zero rows if
+    the goal cannot be reached
+  """
+  H, W = occ_u8.shape
+  n = H * W
+  g = np.full(n, np.inf, dtype=np.float64)
+  parent = np.full(n, -1, dtype=np.int64)
+  closed = np.zeros(n, dtype=np.uint8)
+
+  # Every push follows a strict improvement of g, so 8 pushes per cell is an upper bound
+  heap_f = np.empty(n * 8, dtype=np.float64)
+  heap_i = np.empty(n * 8, dtype=np.int64)
+
+  num_moves = 8 if diag else 4
+  d2_minus_2 = math.sqrt(2) - 2.0
+  start_idx = sy * W + sx
+  goal_idx = gy * W + gx
+
+  g[start_idx] = 0.0
+  size = _heap_push(heap_f, heap_i, 0, 0.0, start_idx)
+  found = False
+
+  while size > 0:
+    node = _heap_pop(heap_f, heap_i, size)
+    size -= 1
+    if closed[node]:
+      continue
+    closed[node] = 1
+
+    if node == goal_idx:
+      found = True
+      break
+
+    y = node // W
+    x = node % W
+    for k in range(num_moves):
+      ny = y + DY[k]
+      nx = x + DX[k]
+      if ny < 0 or ny >= H or nx < 0 or nx >= W:
+        continue
+      if occ_u8[ny, nx] != 0:
+        continue
+      nb = ny * W + nx
+      if closed[nb]:
+        continue
+
+      new_g = g[node] + COST[k]
+      if new_g < g[nb]:
+        g[nb] = new_g
+        parent[nb] = node
+        hy = abs(ny - gy)
+        hx = abs(nx - gx)
+        if diag:
+          h = (hy + hx) + d2_minus_2 * min(hy, hx)
+        else:
+          h = float(hy + hx)
+        size = _heap_push(heap_f, heap_i, size, new_g + h, nb)
+
+  if not found:
+    return np.empty((0, 2), dtype=np.int32)
+
+  # Walk the parent chain once to size the result, then fill it back to front
+  length = 0
+  current = goal_idx
+  while current != -1:
+    length += 1
+    current = parent[current]
+  path = np.empty((length, 2), dtype=np.int32)
+  current = goal_idx
+  for i in range(length - 1, -1, -1):
+    path[i, 0] = current // W
+    path[i, 1] = current % W
+    current = parent[current]
+  return path
\ No newline at end of file
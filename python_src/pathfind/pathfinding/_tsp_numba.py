@@ -0,0 +1,63 @@
+import numpy as np
+from ..utils._jit import njit
+
+
+@njit('int64[:](float64[:, :])', cache=True, nogil=True)
+def held_karp_nb(dist: np.ndarray) -> np.ndarray:
+  """Exact TSP tour from point 0 and back by Held-Karp bitmask dynamic programming.
+
+  Point 0 is fixed as the start, so subsets only range over points 1..n-1:
+  bit v of a mask stands for point v + 1, and dp[mask, v] is the cheapest walk
+  from point 0 through exactly the points in mask, ending at point v + 1.
+
+  Args:
+    dist: (n, n) float64 distance matrix with n >= 2
+
+  Returns:
+    (n + 1,) int64 array of point indices starting and ending with 0
+  """
+  n = dist.shape[0]
+  m = n - 1
+  full = (1 << m) - 1
+  dp = np.full((1 << m, m), np.inf)
+  parent = np.full((1 << m, m), -1, dtype=np.int8)
+
+  for v in range(m):
+    dp[1 << v, v] = dist[0, v + 1]
+
+  # Every mask | (1 << v) is larger than mask, so increasing order visits subsets before supersets
+  for mask in range(1, full + 1):
+    for u in range(m):
+      if not (mask >> u) & 1:
+        continue
+      cost = dp[mask, u]
+      if cost == np.inf:
+        continue
+      for v in range(m):
+        if (mask >> v) & 1:
+          continue
+        next_mask = mask | (1 << v)
+        new_cost = cost + dist[u + 1, v + 1]
+        if new_cost < dp[next_mask, v]:
+          dp[next_mask, v] = new_cost
+          parent[next_mask, v] = u
+
+  # Close the tour back to point 0
+  best = np.inf
+  last = 0
+  for u in range(m):
+    cost = dp[full, u] + dist[u + 1, 0]
+    if cost < best:
+      best = cost
+      last = u
+
+  # Walk the parent table back from the last point
+  order = np.zeros(n + 1, dtype=np.int64)
+  mask = full
+  u = last
+  for k in range(m, 0, -1):
+    order[k] = u + 1
+    prev = int(parent[mask, u])
+    mask ^= 1 << u
+    u = prev
+  return order
\ No newline at end of file
@@ -2,50 +2,56 @@ import math
 import heapq
 from typing import Optional
 import numpy as np
+from ._astar_numba import astar_nb
+from ..utils._jit import HAVE_NUMBA
 
+# Octile distance is (dy + dx) + (sqrt(2) - 2) * min(dy, dx)
+D2_MINUS_2 = math.sqrt(2) - 2.0
 
-def astar(occ: np.ndarray, start: tuple[int, int], goal: tuple[int, int], diag: bool = True) -> Optional[list[tuple[int, int]]]:
+# (dy, dx, cost) moves on the grid
+STRAIGHT_MOVES = [(1, 0, 1), (-1, 0, 1), (0, 1, 1), (0, -1, 1)]
+DIAGONAL_MOVES = STRAIGHT_MOVES + [(1, 1, math.sqrt(2)), (1, -1, math.sqrt(2)),
+                                   (-1, 1, math.sqrt(2)), (-1, -1, math.sqrt(2))]
+
+
+def astar(occ: np.ndarray, start: tuple[int, int], goal: tuple[int, int], diag: bool = True) -> Optional[np.ndarray]:
   """A* pathfinding algorithm.
   
   Args:
-    occ: 2D numpy array where True indicates obstacles
+    occ: 2D numpy array where nonzero indicates obstacles
     start: (y, x) tuple for start position
     goal: (y, x) tuple for goal position  
     diag: bool, whether diagonal moves are allowed
     
   Returns:
-    List of (y, x) tuples representing the path, or None if no path found
+    (N, 2) int32 array of (y, x) rows representing the path, or None if no path found
   """
   H, W = occ.shape
   if occ[start] or occ[goal]:
     return None
+
+  if HAVE_NUMBA:
+    return _astar_jit(occ, start, goal, diag)
     
-  if diag:
-    moves = [(1, 0, 1), (-1, 0, 1), (0, 1, 1), (0, -1, 1),
-             (1, 1, math.sqrt(2)), (1, -1, math.sqrt(2)),
-             (-1, 1, math.sqrt(2)), (-1, -1, math.sqrt(2))]
-  else:
-    moves = [(1, 0, 1), (-1, 0, 1), (0, 1, 1), (0, -1, 1)]
-    
-  def heuristic(a: tuple[int, int], b: tuple[int, int]) -> float:
-    """Heuristic function for A* (octile distance)."""
-    (ay, ax), (by, bx) = a, b
-    dy, dx = abs(ay - by), abs(ax - bx)
-    if diag:
-      D, D2 = 1, math.sqrt(2)
-      return D * (dy + dx) + (D2 - 2 * D) * min(dy, dx)
-    return dy + dx
+  moves = DIAGONAL_MOVES if diag else STRAIGHT_MOVES
     
-  open_heap = []
-  heapq.heappush(open_heap, (heuristic(start, goal), 0, start, None))
+  # Heuristic is octile distance with diagonals, Manhattan without; it is inlined in the loop below
+  gy, gx = goal
+  diag_weight = D2_MINUS_2 if diag else 0.0
+  hy, hx = abs(start[0] - gy), abs(start[1] - gx)
+  
+  # Heap entries are (f_cost, push_order, node); push_order breaks f ties so nodes are never compared
+  open_heap = [((hy + hx) + diag_weight * (hy if hy < hx else hx), 0, start)]
+  push_order = 0
   best_cost = {start: 0}
-  parent = {}
+  parent = {start: None}
+  closed = set()
   
   while open_heap:
-    f_cost, g_cost, node, par = heapq.heappop(open_heap)
-    if node in parent: 
+    _, _, node = heapq.heappop(open_heap)
+    if node in closed: 
       continue
-    parent[node] = par
+    closed.add(node)
     
     if node == goal:
       # Reconstruct path
@@ -55,21 +61,35 @@ def astar(occ: np.ndarray, start: tuple[int, int], goal: tuple[int, int], diag:
         path.append(current)
         current = parent[current]
       path.reverse()
-      return path
+      return np.asarray(path, dtype=np.int32)
       
     y, x = node
+    g_cost = best_cost[node]
     for dy, dx, cost in moves:
       ny, nx = y + dy, x + dx
       if not (0 <= ny < H and 0 <= nx < W): 
         continue
-      if occ[ny, nx]: 
+      if occ[ny, nx] != 0: 
         continue
       
-      new_g_cost = g_cost + cost
       neighbor = (ny, nx)
+      if neighbor in closed:
+        continue
+      new_g_cost = g_cost + cost
       if new_g_cost < best_cost.get(neighbor, float('inf')):
         best_cost[neighbor] = new_g_cost
-        f_cost = new_g_cost + heuristic(neighbor, goal)
-        heapq.heappush(open_heap, (f_cost, new_g_cost, neighbor, node))
+        parent[neighbor] = node
+        push_order += 1
+        hy = ny - gy if ny > gy else gy - ny
+        hx = nx - gx if nx > gx else gx - nx
+        h = (hy + hx) + diag_weight * (hy if hy < hx else hx)
+        heapq.heappush(open_heap, (new_g_cost + h, push_order, neighbor))
         
-  return None
\ No newline at end of file
+  return None
+
+
+def _astar_jit(occ: np.ndarray, start: tuple[int, int], goal: tuple[int, int], diag: bool) -> Optional[np.ndarray]:
+  """Run the precompiled Numba A* kernel, mapping an empty result to None."""
+  occ_u8 = np.ascontiguousarray(occ, dtype=np.uint8)
+  path = astar_nb(occ_u8, start[0], start[1], goal[0], goal[1], diag)
+  return path if len(path) else None
\ No newline at end of file
@@ -1,12 +1,20 @@
-import itertools
+import logging
 import math
 from typing import Optional, Tuple
 import numpy as np
 from .astar import astar
+from ._tsp_numba import held_karp_nb
 from ..utils.grid_utils import line_free
+from ..utils._jit import HAVE_NUMBA, bresenham_nb, path_length_nb
 
+log = logging.getLogger(__name__)
 
-def create_straight_line_path(start: tuple[int, int], end: tuple[int, int]) -> list[tuple[int, int]]:
+# Largest waypoint count solved exactly; the Held-Karp table grows as 2^n * n,
+# which the compiled kernel handles in about 0.1 s at 18 points and plain Python at 12
+EXACT_TSP_MAX_POINTS = 18 if HAVE_NUMBA else 12
+
+
+def create_straight_line_path(start: tuple[int, int], end: tuple[int, int]) -> np.ndarray:
   """Create a straight line path between two points using Bresenham's line algorithm.
   
   Args:
@@ -14,10 +22,12 @@ def create_straight_line_path(start: tuple[int, int], end: tuple[int, int]) -> l
     end: (y, x) ending point
     
   Returns:
-    List of (y, x) points forming a straight line from start to end
+    (N, 2) int32 array of (y, x) points forming a straight line from start to end
   """
   y0, x0 = start
   y1, x1 = end
+  if HAVE_NUMBA:
+    return bresenham_nb(y0, x0, y1, x1)
   
   points = []
   dx = abs(x1 - x0)
@@ -44,74 +54,134 @@ def create_straight_line_path(start: tuple[int, int], end: tuple[int, int]) -> l
       err += dx
       y += sy
   
-  return points
+  return np.asarray(points, dtype=np.int32)
+
+
+def path_length(path: np.ndarray) -> float:
+  """Sum the Euclidean lengths of the steps of an (N, 2) path."""
+  if HAVE_NUMBA:
+    return path_length_nb(np.asarray(path, dtype=np.int32))
+    
+  steps = np.diff(path, axis=0).astype(np.float64)
+  return float(np.hypot(steps[:, 0], steps[:, 1]).sum())
 
 
 def find_optimal_path_between_points(occ: np.ndarray, start: tuple[int, int], end: tuple[int, int], 
-                                   allow_diagonals: bool = True) -> Optional[list[tuple[int, int]]]:
+                                   allow_diagonals: bool = True) -> Optional[np.ndarray]:
   """Find path between two points, using straight line if possible, A* otherwise.
   
   Args:
-    occ: 2D numpy array where True indicates obstacles
+    occ: 2D numpy array where nonzero indicates obstacles
     start: (y, x) starting point
     end: (y, x) ending point
     allow_diagonals: Whether diagonal movement is allowed for A*
     
   Returns:
-    Path between points, or None if impossible
+    (N, 2) int32 array of (y, x) points between start and end, or None if impossible
   """
   # First check if we have direct line of sight
   if line_free(occ, start, end):
-    print(f"  Line of sight available from {start} to {end} - using straight line")
+    log.debug("Line of sight available from %s to %s - using straight line", start, end)
     return create_straight_line_path(start, end)
   else:
-    print(f"  No line of sight from {start} to {end} - using A* pathfinding")
+    log.debug("No line of sight from %s to %s - using A* pathfinding", start, end)
     return astar(occ, start, end, allow_diagonals)
 
 
+def find_segment(occ: np.ndarray, points: list[tuple[int, int]], i: int, j: int,
+                 segments: dict[tuple[int, int], np.ndarray], allow_diagonals: bool = True) -> Optional[np.ndarray]:
+  """Return the path from points[i] to points[j], reusing a cached search in either direction.
+  
+  Args:
+    occ: 2D numpy array where nonzero indicates obstacles
+    points: List of (y, x) waypoint coordinates
+    i: Index of the starting point
+    j: Index of the ending point
+    segments: Cache of paths keyed by (i, j) point indices, filled in as pairs are searched
+    allow_diagonals: Whether diagonal movement is allowed for A*
+    
+  Returns:
+    (N, 2) int32 array of (y, x) points from points[i] to points[j], or None if impossible
+  """
+  if (i, j) in segments:
+    return segments[i, j]
+  if (j, i) in segments:
+    # Moves cost the same both ways, so the reversed path is just as short
+    return segments[j, i][::-1]
+  path = find_optimal_path_between_points(occ, points[i], points[j], allow_diagonals)
+  if path is not None:
+    segments[i, j] = path
+  return path
+
+
+def segment_distance(occ: np.ndarray, points: list[tuple[int, int]], i: int, j: int,
+                     segments: dict[tuple[int, int], np.ndarray], allow_diagonals: bool = True) -> Optional[float]:
+  """Return the travel distance from points[i] to points[j] without building straight paths.
+  
+  With line of sight the leg is the Bresenham line, whose length has a closed
+  form (one diagonal step per minor-axis cell), so no points are generated. Otherwise A* runs and its path is stored in
+  segments, where find_segment picks it up if the route uses this pair.
+  
+  Args:
+    occ: 2D numpy array where nonzero indicates obstacles
+    points: List of (y, x) waypoint coordinates
+    i: Index of the starting point
+    j: Index of the ending point
+    segments: Cache of paths keyed by (i, j) point indices
+    allow_diagonals: Whether diagonal movement is allowed for A*
+    
+  Returns:
+    Distance between the points, or None if no path exists
+  """
+  (y0, x0), (y1, x1) = points[i], points[j]
+  if line_free(occ, points[i], points[j]):
+    dy, dx = abs(y1 - y0), abs(x1 - x0)
+    return max(dy, dx) + (math.sqrt(2) - 1) * min(dy, dx)
+    
+  path = astar(occ, points[i], points[j], allow_diagonals)
+  if path is None:
+    return None
+  segments[i, j] = path
+  return path_length(path)
+
+
 def calculate_distance_matrix(occ: np.ndarray, points: list[tuple[int, int]], 
-                            allow_diagonals: bool = True) -> Optional[list[list[float]]]:
+                            allow_diagonals: bool = True,
+                            segments: Optional[dict[tuple[int, int], np.ndarray]] = None) -> Optional[np.ndarray]:
   """Calculate distance matrix between all pairs of points using A* pathfinding.
   
   Args:
-    occ: 2D numpy array where True indicates obstacles
+    occ: 2D numpy array where nonzero indicates obstacles
     points: List of (y, x) waypoint coordinates
     allow_diagonals: Whether diagonal movement is allowed
+    segments: Optional find_segment cache that receives every A* path searched here
     
   Returns:
-    Distance matrix where matrix[i][j] is the shortest path distance from point i to point j,
-    or None if any path is impossible
+    Symmetric (n, n) float64 array where matrix[i, j] is the shortest path distance
+    from point i to point j, or None if any path is impossible
   """
   n = len(points)
-  distance_matrix = [[0.0 for _ in range(n)] for _ in range(n)]
+  distance_matrix = np.zeros((n, n), dtype=np.float64)
+  if segments is None:
+    segments = {}
   
+  # Moves cost the same in both directions, so d(i, j) == d(j, i) and only i < j is searched
   for i in range(n):
-    for j in range(n):
-      if i == j:
-        distance_matrix[i][j] = 0.0
-      else:
-        # Find path from point i to point j using line of sight optimization
-        path = find_optimal_path_between_points(occ, points[i], points[j], allow_diagonals)
-        if path is None:
-          return None  # No path possible
-        
-        # Calculate path length
-        distance = 0.0
-        for k in range(len(path) - 1):
-          y1, x1 = path[k]
-          y2, x2 = path[k + 1]
-          distance += math.sqrt((y2 - y1)**2 + (x2 - x1)**2)
-        
-        distance_matrix[i][j] = distance
+    for j in range(i + 1, n):
+      distance = segment_distance(occ, points, i, j, segments, allow_diagonals)
+      if distance is None:
+        return None  # No path possible
+      
+      distance_matrix[i, j] = distance_matrix[j, i] = distance
   
   return distance_matrix
 
 
-def solve_tsp_brute_force(distance_matrix: list[list[float]]) -> tuple[list[int], float]:
-  """Solve TSP starting and ending at first point using brute force.
+def solve_tsp_held_karp(distance_matrix: np.ndarray) -> tuple[list[int], float]:
+  """Solve TSP starting and ending at first point exactly with Held-Karp dynamic programming.
   
   Args:
-    distance_matrix: Matrix of distances between all pairs of points
+    distance_matrix: (n, n) float64 array of distances between all pairs of points
     
   Returns:
     Tuple of (optimal_order, total_distance) where optimal_order starts and ends
@@ -121,34 +191,20 @@ def solve_tsp_brute_force(distance_matrix: list[list[float]]) -> tuple[list[int]
   if n <= 1:
     return list(range(n)), 0.0
   if n == 2:
-    return [0, 1, 0], distance_matrix[0][1] + distance_matrix[1][0]
-  
-  # Fix first point as start, permute remaining points, then return to start
-  best_distance = float('inf')
-  best_order = None
+    return [0, 1, 0], float(distance_matrix[0, 1] + distance_matrix[1, 0])
   
-  # Try all permutations of points 1 through n-1 (excluding the fixed start point 0)
-  for perm in itertools.permutations(range(1, n)):
-    order = [0] + list(perm) + [0]  # Start at 0, visit all others, return to 0
-    
-    # Calculate total distance for this circular path
-    total_distance = 0.0
-    for i in range(len(order) - 1):
-      total_distance += distance_matrix[order[i]][order[i + 1]]
-    
-    if total_distance < best_distance:
-      best_distance = total_distance
-      best_order = order
-  
-  return best_order, best_distance
+  # Runs compiled with Numba, or as plain Python for the smaller fallback limit
+  order = held_karp_nb(distance_matrix)
+  total_distance = float(distance_matrix[order[:-1], order[1:]].sum())
+  return order.tolist(), total_distance
 
 
-def solve_tsp_nearest_neighbor(distance_matrix: list[list[float]], 
+def solve_tsp_nearest_neighbor(distance_matrix: np.ndarray, 
                               start_idx: int = 0) -> tuple[list[int], float]:
   """Solve TSP using nearest neighbor heuristic, returning to start point.
   
   Args:
-    distance_matrix: Matrix of distances between all pairs of points
+    distance_matrix: (n, n) float64 array of distances between all pairs of points
     start_idx: Index of starting point (will also be ending point)
     
   Returns:
@@ -159,45 +215,38 @@ def solve_tsp_nearest_neighbor(distance_matrix: list[list[float]],
   if n <= 1:
     return list(range(n)), 0.0
   if n == 2:
-    return [start_idx, 1-start_idx, start_idx], distance_matrix[start_idx][1-start_idx] + distance_matrix[1-start_idx][start_idx]
+    return [start_idx, 1-start_idx, start_idx], float(distance_matrix[start_idx, 1-start_idx] + distance_matrix[1-start_idx, start_idx])
   
-  unvisited = set(range(n))
+  visited = np.zeros(n, dtype=bool)
   current = start_idx
   order = [current]
-  unvisited.remove(current)
+  visited[current] = True
   total_distance = 0.0
   
-  while unvisited:
-    # Find nearest unvisited point
-    nearest_dist = float('inf')
-    nearest_point = None
-    
-    for point in unvisited:
-      dist = distance_matrix[current][point]
-      if dist < nearest_dist:
-        nearest_dist = dist
-        nearest_point = point
+  for _ in range(n - 1):
+    # Nearest unvisited point; visited ones are masked out with infinity
+    nearest_point = int(np.argmin(np.where(visited, np.inf, distance_matrix[current])))
     
     # Move to nearest point
     order.append(nearest_point)
-    total_distance += nearest_dist
+    total_distance += distance_matrix[current, nearest_point]
     current = nearest_point
-    unvisited.remove(nearest_point)
+    visited[nearest_point] = True
   
   # Add return path to start
   order.append(start_idx)
-  total_distance += distance_matrix[current][start_idx]
+  total_distance += distance_matrix[current, start_idx]
   
-  return order, total_distance
+  return order, float(total_distance)
 
 
 def find_optimal_path_through_waypoints(occ: np.ndarray, waypoints: list[tuple[int, int]], 
                                       allow_diagonals: bool = True, optimize_order: bool = True, 
-                                      include_return: bool = True) -> Optional[Tuple[list[tuple[int, int]], int]]:
+                                      include_return: bool = True) -> Optional[Tuple[np.ndarray, int]]:
   """Find the shortest path that visits all waypoints.
   
   Args:
-    occ: 2D numpy array where True indicates obstacles
+    occ: 2D numpy array where nonzero indicates obstacles
     waypoints: List of (y, x) waypoint coordinates to visit
     allow_diagonals: Whether diagonal movement is allowed
     optimize_order: If True, find optimal order. If False, visit in given order.
@@ -205,29 +254,32 @@ def find_optimal_path_through_waypoints(occ: np.ndarray, waypoints: list[tuple[i
     
   Returns:
     Tuple of (complete_path, return_start_index) where:
-    - complete_path: List of (y,x) points for the full path
+    - complete_path: (N, 2) int32 array of (y, x) points for the full path
     - return_start_index: Index in path where return segment begins (-1 if no return)
     Returns None if path is impossible
   """
   if len(waypoints) <= 1:
-    return (waypoints, -1) if waypoints else None
+    return (np.asarray(waypoints, dtype=np.int32).reshape(-1, 2), -1) if waypoints else None
+  
+  # A* paths searched for the distance matrix are reused when the route is built
+  segment_cache = {}
   
   if optimize_order:
     # Calculate distance matrix
-    distance_matrix = calculate_distance_matrix(occ, waypoints, allow_diagonals)
+    distance_matrix = calculate_distance_matrix(occ, waypoints, allow_diagonals, segment_cache)
     if distance_matrix is None:
       return None  # Some waypoints are unreachable
     
     # Solve TSP problem (starting and ending at first point)
-    if len(waypoints) <= 8:  # Use brute force for small sets
-      optimal_order, total_dist = solve_tsp_brute_force(distance_matrix)
+    if len(waypoints) <= EXACT_TSP_MAX_POINTS:  # Solve small sets exactly
+      optimal_order, total_dist = solve_tsp_held_karp(distance_matrix)
     else:  # Use heuristic for larger sets
       optimal_order, total_dist = solve_tsp_nearest_neighbor(distance_matrix)
     
     # Debug: Print the optimal order
-    print(f"Waypoints: {waypoints}")
-    print(f"Optimal TSP order indices: {optimal_order}")
-    print(f"Total distance: {total_dist}")
+    log.debug("Waypoints: %s", waypoints)
+    log.debug("Optimal TSP order indices: %s", optimal_order)
+    log.debug("Total distance: %s", total_dist)
     
     # Remove the duplicate ending point for path building (we'll handle return separately)
     if len(optimal_order) > 1 and optimal_order[-1] == optimal_order[0]:
@@ -241,10 +293,10 @@ def find_optimal_path_through_waypoints(occ: np.ndarray, waypoints: list[tuple[i
       optimal_order = path_order + [0]  # For return path calculation
     else:
       optimal_order = path_order
-    print(f"Using waypoints in given order: {waypoints}")
+    log.debug("Using waypoints in given order: %s", waypoints)
   
   # Build complete path by connecting waypoints in optimal order
-  complete_path = []
+  segments = []
   
   for i in range(len(path_order) - 1):
     start_idx = path_order[i]
@@ -252,34 +304,37 @@ def find_optimal_path_through_waypoints(occ: np.ndarray, waypoints: list[tuple[i
     start_point = waypoints[start_idx]
     end_point = waypoints[end_idx]
     
-    print(f"Connecting waypoint {start_idx} {start_point} to waypoint {end_idx} {end_point}")
+    log.debug("Connecting waypoint %d %s to waypoint %d %s", start_idx, start_point, end_idx, end_point)
     
     # Find path between consecutive waypoints using line-of-sight optimization
-    segment_path = find_optimal_path_between_points(occ, start_point, end_point, allow_diagonals)
+    segment_path = find_segment(occ, waypoints, start_idx, end_idx, segment_cache, allow_diagonals)
     if segment_path is None:
-      print(f"No path found between {start_point} and {end_point}")
+      log.warning("No path found between %s and %s", start_point, end_point)
       return None  # Path segment is impossible
     
-    print(f"Segment path length: {len(segment_path)}")
+    log.debug("Segment path length: %d", len(segment_path))
     
     # Add segment to complete path (avoid duplicating waypoints)
     if i == 0:
-      complete_path.extend(segment_path)
+      segments.append(segment_path)
     else:
-      complete_path.extend(segment_path[1:])  # Skip first point to avoid duplication
+      segments.append(segment_path[1:])  # Skip first point to avoid duplication
   
-  print(f"Complete path length: {len(complete_path)}")
+  complete_path = np.concatenate(segments)
+  log.debug("Complete path length: %d", len(complete_path))
   
-  # Verify that all waypoints are actually in the path
-  waypoints_in_path = []
-  for waypoint in waypoints:
-    if waypoint in complete_path:
-      waypoints_in_path.append(waypoint)
-      print(f"✓ Waypoint {waypoint} found in path")
-    else:
-      print(f"✗ Waypoint {waypoint} NOT found in path")
-  
-  print(f"Total waypoints in path: {len(waypoints_in_path)}/{len(waypoints)}")
+  # Verify that all waypoints are actually in the path; purely diagnostic, so only when debugging
+  if log.isEnabledFor(logging.DEBUG):
+    path_cells = set(map(tuple, complete_path.tolist()))
+    waypoints_in_path = []
+    for waypoint in waypoints:
+      if tuple(waypoint) in path_cells:
+        waypoints_in_path.append(waypoint)
+        log.debug("Waypoint %s found in path", waypoint)
+      else:
+        log.debug("Waypoint %s NOT found in path", waypoint)
+    
+    log.debug("Total waypoints in path: %d/%d", len(waypoints_in_path), len(waypoints))
   
   return_start_index = -1
   
@@ -292,18 +347,19 @@ def find_optimal_path_through_waypoints(occ: np.ndarray, waypoints: list[tuple[i
     last_point = waypoints[last_waypoint_idx]
     first_point = waypoints[first_waypoint_idx]
     
-    print(f"Adding return path from waypoint {last_waypoint_idx} {last_point} to waypoint {first_waypoint_idx} {first_point}")
-    print(f"Return segment will start at index: {return_start_index}")
+    log.debug("Adding return path from waypoint %d %s to waypoint %d %s",
+              last_waypoint_idx, last_point, first_waypoint_idx, first_point)
+    log.debug("Return segment will start at index: %d", return_start_index)
     
     # Find return path using line-of-sight optimization
-    return_path = find_optimal_path_between_points(occ, last_point, first_point, allow_diagonals)
+    return_path = find_segment(occ, waypoints, last_waypoint_idx, first_waypoint_idx, segment_cache, allow_diagonals)
     if return_path is None:
-      print(f"Warning: No return path found from {last_point} to {first_point}")
+      log.warning("No return path found from %s to %s", last_point, first_point)
       return_start_index = -1  # Reset if return path fails
     else:
-      print(f"Return path length: {len(return_path)}")
+      log.debug("Return path length: %d", len(return_path))
       # Add return path, skipping the first point to avoid duplication
-      complete_path.extend(return_path[1:])
-      print(f"Complete path length with return: {len(complete_path)}")
+      complete_path = np.concatenate((complete_path, return_path[1:]))
+      log.debug("Complete path length with return: %d", len(complete_path))
   
   return (complete_path, return_start_index)
\ No newline at end of file
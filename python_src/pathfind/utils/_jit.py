@@ -0,0 +1,123 @@
+"""Optional Numba support.
+
+Numba is not a hard dependency: when it is missing, `njit` becomes a no-op
+decorator and callers check `HAVE_NUMBA` to pick their pure Python path.
+"""
+
+import math
+import numpy as np
+
+try:
+  from numba import njit
+  HAVE_NUMBA = True
+except ImportError:
+  HAVE_NUMBA = False
+
+  def njit(*args, **kwargs):
+    """Stand-in for numba.njit that returns the function unchanged."""
+    if len(args) == 1 and callable(args[0]) and not kwargs:
+      return args[0]
+    return lambda func: func
+
+
+@njit('void(uint8[:, :], int64, int64, int64, int64, int64, uint8)', cache=True)
+def stroke(occ_u8: np.ndarray, y0: int, x0: int, y1: int, x1: int, radius: int, value: int) -> None:
+  """Stamp a square brush along the Bresenham line from (y0, x0) to (y1, x1).
+  
+  Args:
+    occ_u8: 2D uint8 occupancy grid, edited in place
+    y0, x0: Line start
+    y1, x1: Line end
+    radius: Brush half-size in cells
+    value: Value written under the brush (1 = wall, 0 = free)
+  """
+  H, W = occ_u8.shape
+  dx = abs(x1 - x0)
+  dy = abs(y1 - y0)
+  sx = 1 if x0 < x1 else -1
+  sy = 1 if y0 < y1 else -1
+  err = dx - dy
+  x, y = x0, y0
+
+  while True:
+    for yy in range(max(0, y - radius), min(H, y + radius + 1)):
+      for xx in range(max(0, x - radius), min(W, x + radius + 1)):
+        occ_u8[yy, xx] = value
+
+    if x == x1 and y == y1:
+      break
+
+    e2 = 2 * err
+    if e2 > -dy:
+      err -= dy
+      x += sx
+    if e2 < dx:
+      err += dx
+      y += sy
+
+
+@njit('boolean(uint8[:, :], int64, int64, int64, int64)', cache=True, nogil=True)
+def line_free_nb(occ_u8: np.ndarray, y0: int, x0: int, y1: int, x1: int) -> bool:
+  """Compiled line_free: sample the segment about twice per cell, stopping at the first wall.
+  
+  Samples use the same interpolation and round-half-even rounding as the numpy
+  version, so both agree cell for cell.
+  """
+  H, W = occ_u8.shape
+  dy = y1 - y0
+  dx = x1 - x0
+  distance = math.sqrt(dy * dy + dx * dx)
+  if distance == 0:
+    return True
+  
+  num_steps = max(2, int(math.ceil(distance * 2)))
+  step = 1.0 / (num_steps - 1)
+  for i in range(num_steps):
+    t = 1.0 if i == num_steps - 1 else i * step
+    y = int(np.rint(y0 * (1 - t) + y1 * t))
+    x = int(np.rint(x0 * (1 - t) + x1 * t))
+    if y < 0 or y >= H or x < 0 or x >= W or occ_u8[y, x] != 0:
+      return False
+  return True
+
+
+@njit('int32[:, :](int64, int64, int64, int64)', cache=True, nogil=True)
+def bresenham_nb(y0: int, x0: int, y1: int, x1: int) -> np.ndarray:
+  """Compiled Bresenham line from (y0, x0) to (y1, x1) as an (N, 2) int32 array."""
+  dx = abs(x1 - x0)
+  dy = abs(y1 - y0)
+  sx = 1 if x0 < x1 else -1
+  sy = 1 if y0 < y1 else -1
+  err = dx - dy
+  x, y = x0, y0
+  
+  # Each step advances the major axis by one cell
+  points = np.empty((max(dx, dy) + 1, 2), dtype=np.int32)
+  i = 0
+  while True:
+    points[i, 0] = y
+    points[i, 1] = x
+    i += 1
+    
+    if x == x1 and y == y1:
+      break
+    
+    e2 = 2 * err
+    if e2 > -dy:
+      err -= dy
+      x += sx
+    if e2 < dx:
+      err += dx
+      y += sy
+  return points[:i]
+
+
+@njit('float64(int32[:, :])', cache=True, nogil=True, fastmath=True)
+def path_length_nb(path: np.ndarray) -> float:
+  """Compiled sum of the Euclidean lengths of consecutive path steps."""
+  total = 0.0
+  for k in range(path.shape[0] - 1):
+    dy = float(path[k + 1, 0] - path[k, 0])
+    dx = float(path[k + 1, 1] - path[k, 1])
+    total += math.sqrt(dy * dy + dx * dx)
+  return total
\ No newline at end of file
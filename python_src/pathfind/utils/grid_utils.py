@@ -1,60 +1,115 @@
 import math
 import numpy as np
-import random
+from typing import Optional
+from ._jit import HAVE_NUMBA, line_free_nb
 
 
-def disk_offsets(radius: float) -> list[tuple[int, int]]:
-  """Generate offsets for a disk of given radius.
+def disk_row_widths(radius: float) -> list[int]:
+  """Half-widths of the rows of a disk of given radius.
   
   Args:
     radius: Radius of the disk
     
   Returns:
-    List of (dy, dx) offset tuples within the disk
+    List where entry dy + max_offset is the largest dx with dx*dx + dy*dy <= radius^2
   """
   max_offset = int(math.ceil(radius))
-  offsets = []
   radius_squared = radius * radius
+  widths = []
   
   for dy in range(-max_offset, max_offset + 1):
-    for dx in range(-max_offset, max_offset + 1):
-      if dx * dx + dy * dy <= radius_squared:
-        offsets.append((dy, dx))
+    width = -1
+    while (width + 1) * (width + 1) + dy * dy <= radius_squared:
+      width += 1
+    widths.append(width)
   
-  return offsets
+  return widths
+
+
+def shift_or(dst: np.ndarray, src: np.ndarray, dy: int, dx: int) -> None:
+  """OR src shifted by (dy, dx) into dst, dropping cells shifted past the edges."""
+  H, W = src.shape
+  if abs(dy) >= H or abs(dx) >= W:
+    return
+  dst[max(0, dy):H + min(0, dy), max(0, dx):W + min(0, dx)] |= \
+    src[max(0, -dy):H + min(0, -dy), max(0, -dx):W + min(0, -dx)]
 
 
 def inflate(occ: np.ndarray, base_radius: float, extra_radius: float = 0) -> np.ndarray:
   """Inflate obstacles in the occupancy grid by a given radius.
   
+  This is a binary dilation with a disk. The disk is split into rows, so the
+  grid is first dilated horizontally once per distinct row half-width and
+  each row is then OR-ed in with its vertical shift: O(radius) whole-array
+  numpy operations instead of a Python loop over every obstacle cell.
+  
   Args:
-    occ: 2D numpy boolean array where True indicates obstacles
+    occ: 2D numpy uint8 array where nonzero indicates obstacles
     base_radius: Base radius for inflation
     extra_radius: Additional inflation amount
     
   Returns:
-    2D numpy boolean array with inflated obstacles
+    2D numpy uint8 array with inflated obstacles
   """
-  H, W = occ.shape
-  total_radius = base_radius + extra_radius
-  offsets = disk_offsets(total_radius)
-  inflated = occ.copy()
-  
-  obstacle_ys, obstacle_xs = np.where(occ)
-  for y, x in zip(obstacle_ys, obstacle_xs):
-    for dy, dx in offsets:
-      ny, nx = y + dy, x + dx
-      if is_valid_position(ny, nx, H, W):
-        inflated[ny, nx] = True
+  widths = disk_row_widths(base_radius + extra_radius)
+  max_offset = len(widths) // 2
+  walls = (occ != 0).view(np.uint8)
+  
+  # horizontal[w] is walls dilated by w cells to the left and right
+  horizontal = [walls]
+  for w in range(1, max(widths) + 1):
+    row = horizontal[-1].copy()
+    shift_or(row, walls, 0, w)
+    shift_or(row, walls, 0, -w)
+    horizontal.append(row)
+  
+  inflated = horizontal[widths[max_offset]].copy()
+  for dy, width in enumerate(widths, -max_offset):
+    if dy != 0 and width >= 0:
+      shift_or(inflated, horizontal[width], dy, 0)
   
   return inflated
 
 
+def inflate_region(base_occ: np.ndarray, occ: np.ndarray, rect: tuple[int, int, int, int], 
+                   base_radius: float, extra_radius: float = 0) -> None:
+  """Update an inflated grid in place after base_occ changed inside rect.
+  
+  Only cells within the inflation radius of rect can change, and those depend
+  only on base_occ within twice that radius, so just that window is inflated.
+  
+  Args:
+    base_occ: 2D numpy uint8 array of raw obstacles
+    occ: Inflated grid previously computed from base_occ, updated in place
+    rect: (y0, y1, x0, x1) cell range of base_occ that was edited, end-exclusive
+    base_radius: Base radius for inflation
+    extra_radius: Additional inflation amount
+  """
+  H, W = base_occ.shape
+  r = int(math.ceil(base_radius + extra_radius))
+  y0, y1, x0, x1 = rect
+  
+  # Cells whose inflated value may have changed
+  oy0, oy1, ox0, ox1 = max(0, y0 - r), min(H, y1 + r), max(0, x0 - r), min(W, x1 + r)
+  # Cells of base_occ needed to recompute them
+  sy0, sy1, sx0, sx1 = max(0, oy0 - r), min(H, oy1 + r), max(0, ox0 - r), min(W, ox1 + r)
+  
+  window = inflate(base_occ[sy0:sy1, sx0:sx1], base_radius, extra_radius)
+  occ[oy0:oy1, ox0:ox1] = window[oy0 - sy0:oy1 - sy0, ox0 - sx0:ox1 - sx0]
+
+
 def is_valid_position(y: int, x: int, height: int, width: int) -> bool:
   """Check if position is within grid bounds."""
   return 0 <= y < height and 0 <= x < width
 
 
+def union_rect(a: Optional[tuple[int, int, int, int]], b: tuple[int, int, int, int]) -> tuple[int, int, int, int]:
+  """Return the smallest (y0, y1, x0, x1) rect covering both rects; a may be None."""
+  if a is None:
+    return b
+  return (min(a[0], b[0]), max(a[1], b[1]), min(a[2], b[2]), max(a[3], b[3]))
+
+
 def is_point_free(occ: np.ndarray, y: int, x: int) -> bool:
   """Check if a single point is free of obstacles."""
   if not is_valid_position(y, x, occ.shape[0], occ.shape[1]):
@@ -66,7 +121,7 @@ def line_free(occ: np.ndarray, start_point: tuple[int, int], end_point: tuple[in
   """Check if a line segment between two points is free of obstacles.
   
   Args:
-    occ: 2D numpy boolean array where True indicates obstacles
+    occ: 2D numpy uint8 array where nonzero indicates obstacles
     start_point: (y, x) tuple for start point
     end_point: (y, x) tuple for end point
     radius: Safety radius around the line (unused in current implementation)
@@ -75,112 +130,77 @@ def line_free(occ: np.ndarray, start_point: tuple[int, int], end_point: tuple[in
     bool: True if line is free, False if it intersects obstacles
   """
   (y0, x0), (y1, x1) = start_point, end_point
+  if HAVE_NUMBA:
+    return line_free_nb(np.asarray(occ, dtype=np.uint8), y0, x0, y1, x1)
+    
   dy, dx = y1 - y0, x1 - x0
   distance = math.hypot(dy, dx)
   
   if distance == 0: 
     return True
     
+  # Sample about twice per cell and look all samples up in one gather
   num_steps = int(max(2, math.ceil(distance * 2)))
+  t = np.linspace(0, 1, num_steps)
+  ys = np.rint(y0 * (1 - t) + y1 * t).astype(np.intp)
+  xs = np.rint(x0 * (1 - t) + x1 * t).astype(np.intp)
   
-  for t in np.linspace(0, 1, num_steps):
-    y = y0 * (1 - t) + y1 * t
-    x = x0 * (1 - t) + x1 * t
-    yi, xi = int(round(y)), int(round(x))
-    
-    if not is_point_free(occ, yi, xi):
-      return False
-  
-  return True
-
-
-def try_shortcut(occ: np.ndarray, points: list[tuple[int, int]], start_idx: int, end_idx: int, radius: float) -> list[tuple[int, int]]:
-  """Try to create a shortcut between two points in a path."""
-  if line_free(occ, points[start_idx], points[end_idx], radius):
-    return points[:start_idx + 1] + points[end_idx:]
-  return points
+  H, W = occ.shape
+  if ys.min() < 0 or xs.min() < 0 or ys.max() >= H or xs.max() >= W:
+    return False
+  return not occ[ys, xs].any()
 
 
-def shortcut(occ: np.ndarray, path: list[tuple[int, int]], radius: float = 0, max_iterations: int = 200) -> list[tuple[int, int]]:
-  """Apply shortcut optimization to a path.
+def shortcut(occ: np.ndarray, path: np.ndarray, radius: float = 0) -> np.ndarray:
+  """Apply shortcut optimization to a path in one greedy pass.
+  
+  From each kept point, the segment is stretched forward along the path for as
+  long as the straight line to the next point stays free; the last point it
+  reaches is kept and the walk continues from there. That is one line check
+  per path point.
   
   Args:
-    occ: 2D numpy boolean array where True indicates obstacles
-    path: List of (y, x) tuples representing the path
+    occ: 2D numpy uint8 array where nonzero indicates obstacles
+    path: (N, 2) array of (y, x) points representing the path
     radius: Safety radius for line collision checking
-    max_iterations: Number of shortcut attempts
     
   Returns:
-    List of (y, x) tuples representing the optimized path
+    (M, 2) array of (y, x) points representing the optimized path
   """
-  if not path or len(path) <= 2: 
+  if path is None or len(path) <= 2: 
     return path
     
-  points = path[:]
-  
-  for _ in range(max_iterations):
-    if len(points) <= 2: 
-      break
+  keep = [0]
+  start_idx = 0
+  for end_idx in range(2, len(path)):
+    if not line_free(occ, path[start_idx], path[end_idx], radius):
+      # The previous point is the furthest one still visible from start_idx
+      start_idx = end_idx - 1
+      keep.append(start_idx)
+  keep.append(len(path) - 1)
       
-    # Pick random start and end points with at least one point in between
-    start_idx = random.randint(0, len(points) - 3)
-    end_idx = random.randint(start_idx + 2, len(points) - 1)
-    
-    new_points = try_shortcut(occ, points, start_idx, end_idx, radius)
-    if len(new_points) < len(points):
-      points = new_points
-      
-  return points
-
-
-def calculate_segment_points(start_point: np.ndarray, end_point: np.ndarray, step_size: float) -> tuple[list[np.ndarray], float]:
-  """Calculate intermediate points along a path segment."""
-  segment_vector = end_point - start_point
-  segment_length = np.linalg.norm(segment_vector)
-  
-  if segment_length == 0:
-    return [], segment_length
-    
-  direction_vector = segment_vector / segment_length
-  intermediate_points = []
-  
-  distance = 0
-  while distance + step_size <= segment_length + 1e-9:
-    point = start_point + (distance + step_size) * direction_vector
-    intermediate_points.append(point)
-    distance += step_size
-    
-  return intermediate_points, segment_length - distance
+  return path[keep]
 
 
-def resample(path: list[tuple[int, int]], step_size: float = 0.5) -> list[tuple[float, float]]:
-  """Resample a path with uniform spacing.
+def resample(path: np.ndarray, step_size: float = 0.5) -> np.ndarray:
+  """Resample a path with uniform spacing along its length.
   
   Args:
-    path: List of (y, x) tuples representing the path
+    path: (N, 2) array of (y, x) points representing the path
     step_size: Desired spacing between points
     
   Returns:
-    List of (y, x) tuples representing the resampled path
+    (M, 2) float64 array of (y, x) points step_size apart, ending at the last path point
   """
-  if not path or len(path) < 2: 
+  if path is None or len(path) < 2: 
     return path
     
-  # Convert to numpy arrays for easier math
-  points = [np.array([float(y), float(x)]) for (y, x) in path]
-  resampled_points = [points[0].copy()]
-  accumulated_distance = 0
-  
-  for i in range(1, len(points)):
-    intermediate_points, remaining_distance = calculate_segment_points(
-      points[i - 1], points[i], step_size - accumulated_distance
-    )
-    
-    resampled_points.extend(intermediate_points)
-    accumulated_distance = remaining_distance
+  points = np.asarray(path, dtype=np.float64)
   
-  # Always include the final point
-  resampled_points.append(points[-1].copy())
+  # Arc length at every path point, then evenly spaced stations along it
+  segment_lengths = np.hypot(*np.diff(points, axis=0).T)
+  arc_length = np.concatenate(([0.0], np.cumsum(segment_lengths)))
+  stations = np.append(np.arange(0.0, arc_length[-1], step_size), arc_length[-1])
   
-  # Convert back to tuples
-  return [(point[0], point[1]) for point in resampled_points]
\ No newline at end of file
+  return np.stack((np.interp(stations, arc_length, points[:, 0]),
+                   np.interp(stations, arc_length, points[:, 1])), axis=1)
\ No newline at end of file